@@ -0,0 +1,60 @@
+"""
+Build script for the ahead-of-time compiled kernels of the Returns Calculator.
+Compiles the dynamic program kernels of `src/_kernels.py` into the
+`src.returns_kernels` extension module with Numba, and `src/_dp.pyx` into the
+`src._dp` extension module with Cython, so that runs do not pay any JIT
+compilation cost.
+
+Usage: python build_kernels.py
+"""
+
+import os
+
+ROOT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_numba_kernels():
+    """
+    Compile the Numba kernels of `src/_kernels.py` into `src.returns_kernels`.
+    """
+
+    from numba.pycc import CC
+
+    from src._kernels import _dp_kernel_loops, _dp_kernel_unrolled
+
+    cc = CC("returns_kernels")
+    cc.output_dir = os.path.join(ROOT_FOLDER, "src")
+
+    # Signatures: flat (months, currencies^2) returns, then the integer arguments
+    cc.export("dp_max_return_f64", "f8(f8[:, ::1], i8, i8, i8, i8, i8)")(
+        _dp_kernel_loops
+    )
+    cc.export("dp_max_return_4x4_f64", "f8(f8[:, ::1], i8, i8, i8, i8)")(
+        _dp_kernel_unrolled
+    )
+    cc.compile()
+
+
+def build_cython_kernel():
+    """
+    Compile `src/_dp.pyx` in place into the `src._dp` extension module.
+    """
+
+    from Cython.Build import cythonize
+    from setuptools import Distribution, Extension
+
+    extension = Extension(
+        "src._dp",
+        [os.path.join("src", "_dp.pyx")],
+        extra_compile_args=["-O3", "-march=native", "-ffast-math"],
+    )
+    distribution = Distribution({"ext_modules": cythonize([extension])})
+    build_ext = distribution.get_command_obj("build_ext")
+    build_ext.inplace = True
+    distribution.run_command("build_ext")
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT_FOLDER)
+    build_numba_kernels()
+    build_cython_kernel()
@@ -0,0 +1,100 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Returns Calculator:
+C implementation of the dynamic program kernel, see `_dp_kernel_loops` in _kernels.py
+Build with `python build_kernels.py`.
+"""
+
+from libc.stdlib cimport malloc, free
+
+
+cdef double _dp_max_return(
+    const double[:, ::1] monthly_returns_flat,
+    Py_ssize_t num_months,
+    Py_ssize_t num_currencies,
+    Py_ssize_t first_month,
+    Py_ssize_t from_currency,
+    Py_ssize_t to_trade_currency,
+    double *best,
+    double *best_next,
+) noexcept nogil:
+    cdef Py_ssize_t month, currency, to_currency, base
+    cdef double best_multiplier, multiplier
+    cdef double *swap
+
+    # Last month trade is forced to end with GBP (Problem constraint)
+    for currency in range(num_currencies):
+        best_next[currency] = monthly_returns_flat[
+            num_months - 1, currency * num_currencies + to_trade_currency
+        ]
+
+    # Walk back in time, keeping the best multiplier reachable from each currency
+    for month in range(num_months - 2, first_month - 1, -1):
+        for currency in range(num_currencies):
+            base = currency * num_currencies
+            best_multiplier = 0.0
+            for to_currency in range(num_currencies):
+                multiplier = (
+                    monthly_returns_flat[month, base + to_currency]
+                    * best_next[to_currency]
+                )
+                best_multiplier = (
+                    multiplier if multiplier > best_multiplier else best_multiplier
+                )
+            best[currency] = best_multiplier
+        swap = best
+        best = best_next
+        best_next = swap
+
+    return best_next[from_currency]
+
+
+def dp_max_return(
+    const double[:, ::1] monthly_returns_flat,
+    Py_ssize_t num_months,
+    Py_ssize_t num_currencies,
+    Py_ssize_t first_month,
+    Py_ssize_t from_currency,
+    Py_ssize_t to_trade_currency,
+):
+    """
+    Calculate the best return multiplier with a bottom-up dynamic program
+
+    Args:
+        monthly_returns_flat (np.ndarray): The monthly returns of currencies in a
+                     2D array of shape (12,16)
+        num_months (int): The total number of months
+        num_currencies (int): The total number of currencies
+        first_month (int): The month the trading starts
+        from_currency (int): The currency the trading starts with
+        to_trade_currency (int): The currency the last month's trade must end with
+
+    Returns:
+        best_multiplier (float): The maximum multiplier over the trading period
+    """
+
+    cdef double stack_buffer[8]
+    cdef double *buffer = stack_buffer
+    cdef double best_multiplier
+
+    # The two scratch rows live on the stack for up to 4 currencies
+    if num_currencies > 4:
+        buffer = <double *> malloc(2 * num_currencies * sizeof(double))
+        if buffer == NULL:
+            raise MemoryError()
+
+    with nogil:
+        best_multiplier = _dp_max_return(
+            monthly_returns_flat,
+            num_months,
+            num_currencies,
+            first_month,
+            from_currency,
+            to_trade_currency,
+            buffer,
+            buffer + num_currencies,
+        )
+
+    if buffer != stack_buffer:
+        free(buffer)
+    return best_multiplier
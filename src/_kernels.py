@@ -0,0 +1,287 @@
+"""
+Returns Calculator:
+Dynamic program kernels calculating the best return multiplier over the year.
+The kernels live in their own module so that it is always imported as
+`src._kernels`, whichever way the application is started; Numba's on-disk cache
+records that module name.
+"""
+
+import os
+import numpy as np
+
+try:
+    import numba
+    from numba import prange
+except ImportError:  # Numba is optional, the NumPy kernel is used without it
+    numba = None
+    prange = range
+
+try:
+    # Ahead-of-time compiled kernels, built into src/ with `python build_kernels.py`
+    from src.returns_kernels import dp_max_return_f64, dp_max_return_4x4_f64
+except ImportError:  # Not built, the kernels are JIT compiled or run with NumPy
+    dp_max_return_f64 = dp_max_return_4x4_f64 = None
+
+try:
+    # Cython kernel, built in place with `python build_kernels.py`; imported via the
+    # package, which main.py makes importable however the application is started
+    from src._dp import dp_max_return
+except ImportError:  # Not built, the Numba or NumPy kernels are used instead
+    dp_max_return = None
+
+# Number of trades (months * currencies^2) from which the currencies of a month
+# are reduced in parallel, overridable with `PARALLEL_MIN_TRADES`. With a single
+# thread the parallel build was measured slower up to ~3M trades and no faster
+# beyond, so it is only used with several threads; the default is not tuned
+_PARALLEL_MIN_TRADES = int(os.getenv("PARALLEL_MIN_TRADES", str(1 << 18)))
+
+
+def _dp_kernel_numpy(
+    monthly_returns_flat: np.ndarray,
+    num_months: int,
+    num_currencies: int,
+    first_month: int,
+    from_currency: int,
+    to_trade_currency: int,
+) -> float:
+    """
+    Calculate the best return multiplier with a bottom-up dynamic program
+
+    The multiplier is independent of the portfolio value, so the best multiplier
+    for every currency is reduced backwards in time, one month at a time:
+    best[c] = max_k arr[m, c, k] * best_next[k]
+
+    Args:
+        monthly_returns_flat (np.ndarray): The monthly returns of currencies in a
+                     2D array of shape (12,16), row c * 4 + k of a month being the
+                     return of trading currency c to currency k
+        num_months (int): The total number of months
+        num_currencies (int): The total number of currencies
+        first_month (int): The month the trading starts
+        from_currency (int): The currency the trading starts with
+        to_trade_currency (int): The currency the last month's trade must end with
+
+    Returns:
+        best_multiplier (float): The maximum multiplier over the trading period
+    """
+
+    trade_returns = monthly_returns_flat.reshape(
+        num_months, num_currencies, num_currencies
+    )
+
+    # Last month trade is forced to end with GBP (Problem constraint)
+    best = trade_returns[num_months - 1, :, to_trade_currency].copy()
+
+    # Walk back in time, keeping the best multiplier reachable from each currency
+    for month in range(num_months - 2, first_month - 1, -1):
+        best = np.maximum.reduce(trade_returns[month] * best[np.newaxis, :], axis=1)
+
+    return best[from_currency]
+
+
+def _dp_kernel_loops(
+    monthly_returns_flat: np.ndarray,
+    num_months: int,
+    num_currencies: int,
+    first_month: int,
+    from_currency: int,
+    to_trade_currency: int,
+) -> float:
+    """
+    Calculate the best return multiplier with explicit loops, for Numba to compile
+
+    Same dynamic program as `_dp_kernel_numpy`, written as plain loops over two
+    preallocated buffers so that the compiled version avoids any allocation or
+    ufunc dispatch inside the month loop. The currencies of a month are
+    independent, so they are spread over threads when compiled with parallel=True.
+
+    Args:
+        monthly_returns_flat (np.ndarray): The monthly returns of currencies in a
+                     2D array of shape (12,16)
+        num_months (int): The total number of months
+        num_currencies (int): The total number of currencies
+        first_month (int): The month the trading starts
+        from_currency (int): The currency the trading starts with
+        to_trade_currency (int): The currency the last month's trade must end with
+
+    Returns:
+        best_multiplier (float): The maximum multiplier over the trading period
+    """
+
+    best = np.empty(num_currencies)
+    best_next = np.empty(num_currencies)
+
+    # Last month trade is forced to end with GBP (Problem constraint)
+    last_month_returns = monthly_returns_flat[num_months - 1]
+    for currency in range(num_currencies):
+        best_next[currency] = last_month_returns[
+            currency * num_currencies + to_trade_currency
+        ]
+
+    # Walk back in time, keeping the best multiplier reachable from each currency
+    for month in range(num_months - 2, first_month - 1, -1):
+        month_returns = monthly_returns_flat[month]
+        for currency in prange(num_currencies):
+            base = currency * num_currencies
+            best_multiplier = 0.0
+            for to_currency in range(num_currencies):
+                multiplier = month_returns[base + to_currency] * best_next[to_currency]
+                # max() compiles to a conditional select, not a branch
+                best_multiplier = max(best_multiplier, multiplier)
+            best[currency] = best_multiplier
+        best, best_next = best_next, best
+
+    return best_next[from_currency]
+
+
+def _dp_kernel_unrolled(
+    monthly_returns_flat: np.ndarray,
+    num_months: int,
+    first_month: int,
+    from_currency: int,
+    to_trade_currency: int,
+) -> float:
+    """
+    Calculate the best return multiplier for exactly 4 currencies, for Numba to compile
+
+    Same dynamic program as `_dp_kernel_loops` with the currency loops fully
+    unrolled: the best multipliers live in four scalars and each row maximum is
+    a tree of independent multiplies and max() calls.
+
+    Args:
+        monthly_returns_flat (np.ndarray): The monthly returns of currencies in a
+                     2D array of shape (12,16)
+        num_months (int): The total number of months
+        first_month (int): The month the trading starts
+        from_currency (int): The currency the trading starts with
+        to_trade_currency (int): The currency the last month's trade must end with
+
+    Returns:
+        best_multiplier (float): The maximum multiplier over the trading period
+    """
+
+    # Last month trade is forced to end with GBP (Problem constraint)
+    returns = monthly_returns_flat[num_months - 1]
+    best_0 = returns[to_trade_currency]
+    best_1 = returns[4 + to_trade_currency]
+    best_2 = returns[8 + to_trade_currency]
+    best_3 = returns[12 + to_trade_currency]
+
+    # Walk back in time, keeping the best multiplier reachable from each currency
+    for month in range(num_months - 2, first_month - 1, -1):
+        returns = monthly_returns_flat[month]
+        next_0 = max(
+            max(returns[0] * best_0, returns[1] * best_1),
+            max(returns[2] * best_2, returns[3] * best_3),
+        )
+        next_1 = max(
+            max(returns[4] * best_0, returns[5] * best_1),
+            max(returns[6] * best_2, returns[7] * best_3),
+        )
+        next_2 = max(
+            max(returns[8] * best_0, returns[9] * best_1),
+            max(returns[10] * best_2, returns[11] * best_3),
+        )
+        next_3 = max(
+            max(returns[12] * best_0, returns[13] * best_1),
+            max(returns[14] * best_2, returns[15] * best_3),
+        )
+        best_0, best_1, best_2, best_3 = next_0, next_1, next_2, next_3
+
+    return (best_0, best_1, best_2, best_3)[from_currency]
+
+
+# Use the compiled kernels when Numba is available; cache=True stores the
+# compiled code in __pycache__ so later runs skip the compilation step
+if numba is not None:
+    _dp_kernel_general = numba.njit(cache=True, fastmath=True)(_dp_kernel_loops)
+    _dp_kernel_4x4 = numba.njit(cache=True, fastmath=True)(_dp_kernel_unrolled)
+else:
+    _dp_kernel_general = _dp_kernel_numpy
+    _dp_kernel_4x4 = None
+
+# Numba's on-disk cache ignores parallel=True, so the parallel build of the same
+# function is not cached; it is only compiled for the large problems that use it
+if numba is not None and numba.config.NUMBA_NUM_THREADS > 1:
+    _dp_kernel_parallel = numba.njit(cache=False, fastmath=True, parallel=True)(
+        _dp_kernel_loops
+    )
+else:
+    _dp_kernel_parallel = None
+
+# Prefer the ahead-of-time compiled kernels, which need no compilation at all;
+# the C loop of the Cython kernel handles every shape without dispatch
+if dp_max_return is not None:
+    _dp_kernel_general = dp_max_return
+    _dp_kernel_4x4 = None
+elif dp_max_return_f64 is not None:
+    _dp_kernel_general = dp_max_return_f64
+    _dp_kernel_4x4 = dp_max_return_4x4_f64
+
+
+def _dp_kernel(
+    monthly_returns_arr: np.ndarray,
+    num_months: int,
+    num_currencies: int,
+    first_month: int,
+    from_currency: int,
+    to_trade_currency: int,
+) -> float:
+    """
+    Calculate the best return multiplier with the fastest kernel for the data shape
+
+    Args:
+        monthly_returns_arr (np.ndarray): The monthly returns of currencies in a
+                     3D array of shape (12,4,4)
+        num_months (int): The total number of months
+        num_currencies (int): The total number of currencies
+        first_month (int): The month the trading starts
+        from_currency (int): The currency the trading starts with
+        to_trade_currency (int): The currency the last month's trade must end with
+
+    Returns:
+        best_multiplier (float): The maximum multiplier over the trading period
+    """
+
+    # Flatten each month to one contiguous row, so the kernels index a trade
+    # with a single add (c * num_currencies + k); a view for load_data output
+    monthly_returns_flat = np.ascontiguousarray(
+        monthly_returns_arr[:num_months, :num_currencies, :num_currencies]
+    ).reshape(num_months, num_currencies * num_currencies)
+
+    # The unrolled kernel is specialised for the (12,4,4) shape of the problem
+    if (
+        _dp_kernel_4x4 is not None
+        and monthly_returns_arr.shape == (12, 4, 4)
+        and num_currencies == 4
+    ):
+        return _dp_kernel_4x4(
+            monthly_returns_flat,
+            num_months,
+            first_month,
+            from_currency,
+            to_trade_currency,
+        )
+
+    # Large problems are worth spreading over threads
+    if (
+        _dp_kernel_parallel is not None
+        and monthly_returns_flat.size >= _PARALLEL_MIN_TRADES
+    ):
+        return _dp_kernel_parallel(
+            monthly_returns_flat,
+            num_months,
+            num_currencies,
+            first_month,
+            from_currency,
+            to_trade_currency,
+        )
+
+    return _dp_kernel_general(
+        monthly_returns_flat,
+        num_months,
+        num_currencies,
+        first_month,
+        from_currency,
+        to_trade_currency,
+    )
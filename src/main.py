@@ -7,9 +7,34 @@ For more details, please refer to the README.md file and design document.
 import sys
 import logging
 import json
+import mmap
 import os
+import tempfile
+from functools import lru_cache
 import numpy as np
 
+# When run as a script (`python src/main.py`), make the `src` package importable,
+# so that its modules get the same names as with `python -m src.main` or pytest
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src._kernels import _dp_kernel  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard json module is used without it
+    orjson = None
+
+# Trading constraints and data location, read once at import
+_START_MONTH = int(os.getenv("START_MONTH", "0"))  # First month
+_FROM_CURRENCY = int(os.getenv("FROM_CURRENCY", "0"))  # GBP
+_TO_TRADE_CURRENCY = int(os.getenv("TO_TRADE_CURRENCY", "0"))  # GBP
+_DATA_FOLDER = os.getenv("DATA_FOLDER", "./data/")
+_DISABLE_LOAD_CACHE = bool(os.getenv("DISABLE_LOAD_CACHE"))
+_DISABLE_BINARY_CACHE = bool(os.getenv("DISABLE_BINARY_CACHE"))
+
+# Shape of the monthly returns data: 12 months of trades between 4 currencies
+_DATA_SHAPE = (12, 4, 4)
 
 # Check if the root logger has handlers
 if not logging.root.handlers:
@@ -20,9 +45,203 @@ if not logging.root.handlers:
     )
 
 
+class _StdoutHandler(logging.StreamHandler):
+    """
+    Stream handler that always writes to the current `sys.stdout`, so that output
+    still goes to the console when `sys.stdout` is replaced (e.g. while captured)
+    """
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, _stream):
+        pass
+
+
+# Messages for the user are printed to the console and propagated to the log file
+console_logger = logging.getLogger(f"{__name__}.console")
+console_logger.setLevel(logging.INFO)
+if not console_logger.handlers:
+    _console_handler = _StdoutHandler()
+    _console_handler.setFormatter(logging.Formatter("%(message)s"))
+    console_logger.addHandler(_console_handler)
+
+
+def _write_binary_cache(
+    binary_path: str, monthly_returns_arr: np.ndarray, mtime_ns: int
+) -> None:
+    """
+    Save parsed monthly returns next to their text file, for `_read_data` to reuse.
+
+    The file is written to a temporary name and then renamed, so readers never see
+    a partial file, and it is stamped with the modification time of the text file.
+
+    Args:
+        binary_path (str): The path of the `.npy` file to be written
+        monthly_returns_arr (np.ndarray): The parsed monthly returns
+        mtime_ns (int): The modification time of the text file
+    """
+
+    try:
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(binary_path) or ".", suffix=".npy.tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.save(file, monthly_returns_arr)
+            os.utime(temp_path, ns=(mtime_ns, mtime_ns))
+            os.replace(temp_path, binary_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as os_exception:
+        # The cache is only an optimisation, e.g. the data folder may be read-only
+        logging.warning(
+            "Could not write binary cache %s: %s", binary_path, os_exception
+        )
+
+
+def _as_monthly_returns(values: np.ndarray) -> np.ndarray:
+    """
+    Arrange a flat sequence of returns as months of 4x4 currency trades.
+
+    Args:
+        values (np.ndarray): 1D numpy array of monthly returns
+
+    Returns:
+        monthly_returns_arr (np.ndarray): 3D numpy array of monthly returns, or the
+            input unchanged if it does not hold whole months (rejected by load_data)
+    """
+
+    if values.size % 16 == 0:
+        return values.reshape(-1, 4, 4)
+    return values
+
+
+def _read_raw_binary(file_path: str) -> np.ndarray:
+    """
+    Read monthly returns stored as raw little-endian float64 values.
+
+    The file is memory-mapped read-only and viewed in place, without creating any
+    Python objects for the values.
+
+    Args:
+        file_path (str): The path of the file to be read
+
+    Returns:
+        monthly_returns_arr (np.ndarray): read-only numpy array of monthly returns
+    """
+
+    with open(file_path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return _as_monthly_returns(np.frombuffer(buffer, dtype="<f8"))
+
+
+def _read_text_table(file_path: str) -> np.ndarray:
+    """
+    Read monthly returns stored as whitespace-separated numbers.
+
+    Args:
+        file_path (str): The path of the file to be read
+
+    Returns:
+        monthly_returns_arr (np.ndarray): numpy array of monthly returns
+    """
+
+    values = np.loadtxt(file_path, dtype=np.float64, ndmin=1).ravel()
+    return _as_monthly_returns(values)
+
+
+def _read_data(file_path: str) -> np.ndarray:
+    """
+    Read monthly returns data from a JSON-like text file or a binary `.npy` file,
+    or from raw float64 values (`.bin`) or whitespace-separated numbers (`.dat`).
+
+    Parsed JSON-like text files are saved as `<file>.npy` alongside them, and that
+    binary copy is memory-mapped instead of parsing again while the file is unchanged.
+    Set `DISABLE_BINARY_CACHE` to always parse the text file.
+
+    Args:
+        file_path (str): The path of the file to be read
+
+    Returns:
+        monthly_returns_arr (np.ndarray): numpy array of monthly returns
+    """
+
+    if file_path.endswith(".npy"):
+        # Binary NumPy data is memory-mapped, there is nothing to parse
+        return np.load(file_path, mmap_mode="r")
+    if file_path.endswith(".bin"):
+        return _read_raw_binary(file_path)
+    if file_path.endswith(".dat"):
+        return _read_text_table(file_path)
+
+    mtime_ns = os.stat(file_path).st_mtime_ns
+    binary_path = file_path + ".npy"
+    if not _DISABLE_BINARY_CACHE:
+        try:
+            # The binary copy carries the modification time of the text it came from
+            if os.stat(binary_path).st_mtime_ns == mtime_ns:
+                return np.load(binary_path, mmap_mode="r")
+        except (OSError, ValueError):
+            pass  # Missing or unreadable binary copy, parse the text file
+
+    # Read the file content
+    with open(file_path, "rb") as file:
+        file_content = file.read()
+    # Parse the JSON-like content
+    if orjson is not None:
+        data = orjson.loads(file_content)
+    else:
+        data = json.loads(file_content)
+    monthly_returns_arr = np.array(data)
+    # Reject anything but numbers (e.g. null or "1.5") instead of converting it
+    if not np.issubdtype(monthly_returns_arr.dtype, np.number):
+        raise TypeError(
+            f"Returns data must be numbers, not {monthly_returns_arr.dtype}"
+        )
+    # C-contiguous float64 lets the kernels read the returns with
+    # packed, aligned loads (float32 would change the reported return)
+    monthly_returns_arr = np.ascontiguousarray(monthly_returns_arr, dtype=np.float64)
+
+    # Only valid data is cached; load_data reports the error for anything else
+    if (
+        not _DISABLE_BINARY_CACHE
+        and monthly_returns_arr.shape == _DATA_SHAPE
+        and np.isfinite(monthly_returns_arr).all()
+    ):
+        _write_binary_cache(binary_path, monthly_returns_arr, mtime_ns)
+    return monthly_returns_arr
+
+
+@lru_cache(maxsize=8)
+def _read_data_cached(file_path: str, mtime_ns: int) -> np.ndarray:
+    """
+    Read monthly returns data once per file version, see `_read_data`.
+
+    Args:
+        file_path (str): The path of the file to be read
+        mtime_ns (int): The modification time of the file, so that changed files
+            are read again
+
+    Returns:
+        monthly_returns_arr (np.ndarray): read-only numpy array of monthly returns
+    """
+
+    monthly_returns_arr = _read_data(file_path)
+    # The array is shared by every caller; protect the cached copy from mutation
+    monthly_returns_arr.flags.writeable = False
+    return monthly_returns_arr
+
+
 def load_data(input_filename: str) -> np.ndarray:
     """
-    Load monthly returns data from a text file.
+    Load monthly returns data from a text file, or from a binary `.npy`/`.bin` file.
+
+    Loaded files are cached until they are modified; the returned array is then a
+    read-only view of the cached data. Set `DISABLE_LOAD_CACHE` to always re-read.
 
     Args:
         input_filename (str): The name of the file to be loaded
@@ -33,41 +252,52 @@ def load_data(input_filename: str) -> np.ndarray:
     Raises:
         FileNotFoundError: If the file is not found in the `data/` location
         json.JSONDecodeError: If there is any error while parsing the JSON-like content
+        TypeError: If the JSON-like content holds anything but numbers
+        ValueError: If the data contains NaN or infinite values
         Exception: If there is any other error while reading the file
     """
 
     try:
-        # Read the file content
-        data_folder = os.getenv("DATA_FOLDER", "./data/")
-        with open(data_folder + input_filename, "r", encoding="utf-8") as file:
-            file_content = file.read()
-            # Parse the JSON-like content
-            data = json.loads(file_content)
-            monthly_returns_arr = np.array(data)
-
-            # Check for datashape : 12,4,4 else print error and exit
-            if monthly_returns_arr.shape != (12, 4, 4):
-                print(
-                    "Please provide 12 months of data with 4 currencies each month. \n   \
-                    !!! 3D ARRAY OF FORMAT (12,4,4) REQUIRED !!!"
-                )
-                raise Exception
-            else:
-                return monthly_returns_arr
+        file_path = _DATA_FOLDER + input_filename
+        if _DISABLE_LOAD_CACHE:
+            monthly_returns_arr = _read_data(file_path)
+        else:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            monthly_returns_arr = _read_data_cached(file_path, mtime_ns).view()
+
+        # Check for datashape : 12,4,4 else print error and exit
+        if monthly_returns_arr.shape != _DATA_SHAPE:
+            console_logger.error(
+                "Please provide 12 months of data with 4 currencies each month. \n   \
+                !!! 3D ARRAY OF FORMAT (12,4,4) REQUIRED !!!"
+            )
+            raise Exception
+        # Check for NaN or infinite returns, whichever format they were read from
+        elif not np.isfinite(monthly_returns_arr).all():
+            console_logger.error(
+                "Please provide finite numerical returns only; "
+                "the data contains NaN or infinite values."
+            )
+            raise ValueError("Returns data contains NaN or infinite values")
+        else:
+            return monthly_returns_arr
     # Handle exceptions
     except FileNotFoundError:
-        print(f"Error: File not found in the given location: ./data/{ input_filename}")
+        console_logger.error(
+            "Error: File not found in the given location: %s", file_path
+        )
         raise FileNotFoundError
     except json.JSONDecodeError as json_exception:
-        print(
+        console_logger.error(
             "Error: Problem with reading the file; check the content of the file. \
               Use only numerical data represented as a 3D matrix of shape (12,4,4)"
         )
         raise json_exception
     except Exception as generic_except:
-        print(
-            f"Error: Unexpected problem while loading the data;\
-                  please check with the development team. {generic_except}",
+        console_logger.error(
+            "Error: Unexpected problem while loading the data;\
+                  please check with the development team. %s",
+            generic_except,
         )
         raise generic_except
 
@@ -79,10 +309,13 @@ def max_return(
     monthly_returns_arr: np.ndarray,
     num_months: int,
     num_currencies: int,
+    /,
 ) -> float:
     """
     Calculate the maximum return from a portfolio of currencies
 
+    All arguments are positional-only, which keeps argument binding cheap.
+
     Args:
         month (int): The current month
         from_currency (int): The current currency
@@ -97,33 +330,61 @@ def max_return(
             returns data and portfolio value
     """
 
-    # Check if we have reached the last but one month: Need to end trade with
-    if month == num_months - 1:
-        # Switch last month trade to GBP (Problem constraint)
-        to_trade_currency = int(os.getenv("TO_TRADE_CURRENCY", "0"))
-        trade_return = monthly_returns_arr[month, from_currency, to_trade_currency]
-        total_trade_return = portfolio_value * trade_return
-        return total_trade_return
-
+    trade_returns = monthly_returns_arr[:num_months, :num_currencies, :num_currencies]
+
+    # Upper bound on the multiplier still achievable from each month onwards:
+    # the product of the best single trade of every remaining month
+    per_month_max = trade_returns.max(axis=(1, 2))
+    suffix_upper = np.concatenate([np.cumprod(per_month_max[::-1])[::-1], [1.0]])
+    suffix_upper = suffix_upper.tolist()
+
+    # Plain nested lists and locals: single-int indexing of Python floats is much
+    # cheaper in the loop than 3-index lookups that box NumPy scalars
+    trade_returns = trade_returns.tolist()
+    last_month = num_months - 1
+    to_trade_currencies = range(num_currencies)
+
+    # Portfolio values still to be traded: (month, currency held, value)
+    stack = [(month, from_currency, portfolio_value)]
+    # Best value reached so far when holding a currency at the start of a month;
+    # the remaining trades do not depend on the value, so a smaller value there
+    # can never lead to a larger return and is not explored again
+    best_values = {}
     max_total_returns = 0
 
-    # Iterate over all possible trades in the current month
-    for to_trade_currency in range(num_currencies):
-        trade_return = monthly_returns_arr[month, from_currency, to_trade_currency]
-        total_trade_return = portfolio_value * trade_return
-
-        # Recursively calculate the maximum return from the next month
-        next_return = max_return(
-            month + 1,
-            to_trade_currency,
-            total_trade_return,
-            monthly_returns_arr,
-            num_months,
-            num_currencies,
-        )
+    # Explore the trades with an explicit stack instead of recursion
+    while stack:
+        month, from_currency, portfolio_value = stack.pop()
+
+        # Returns of every trade out of the held currency this month
+        from_returns = trade_returns[month][from_currency]
+
+        # Check if we have reached the last month: Need to end trade with GBP
+        if month == last_month:
+            # Switch last month trade to GBP (Problem constraint)
+            trade_return = from_returns[_TO_TRADE_CURRENCY]
+            total_trade_return = portfolio_value * trade_return
+
+            # Update the maximum profit (a conditional avoids the generic max() call)
+            if total_trade_return > max_total_returns:
+                max_total_returns = total_trade_return
+            continue
 
-        # Update the maximum profit
-        max_total_returns = max(max_total_returns, next_return)
+        # Iterate over all possible trades in the current month
+        next_month = month + 1
+        next_upper = suffix_upper[next_month]
+        for to_trade_currency in to_trade_currencies:
+            total_trade_return = portfolio_value * from_returns[to_trade_currency]
+
+            # Skip trades that cannot beat the best return found so far
+            if total_trade_return * next_upper <= max_total_returns:
+                continue
+
+            next_state = (next_month, to_trade_currency)
+            if total_trade_return <= best_values.get(next_state, -1.0):
+                continue
+            best_values[next_state] = total_trade_return
+            stack.append((next_month, to_trade_currency, total_trade_return))
 
     return max_total_returns
 
@@ -139,27 +400,48 @@ def calculate_max_return(
 
     Returns:
         maximum_returns (float): The maximum possible returns for the given returns data
+
+    Raises:
+        IndexError: If the configured start month or currencies are not in the
+            returns data
     """
 
+    # The kernels expect C-contiguous float64 data; a no-op for load_data output
+    monthly_returns_arr = np.ascontiguousarray(monthly_returns_arr, dtype=np.float64)
+
     # Get the number of months and currencies
     num_months = monthly_returns_arr.shape[0]
     num_currencies = monthly_returns_arr.shape[1]
 
+    # The kernels would silently return the last month's trade for a later start
+    if not 0 <= _START_MONTH < num_months:
+        raise IndexError(
+            f"START_MONTH={_START_MONTH} is out of range for {num_months} months"
+        )
+
+    # The compiled kernels do not check bounds, so reject currencies outside the data
+    for name, currency in [
+        ("FROM_CURRENCY", _FROM_CURRENCY),
+        ("TO_TRADE_CURRENCY", _TO_TRADE_CURRENCY),
+    ]:
+        if not 0 <= currency < num_currencies:
+            raise IndexError(
+                f"{name}={currency} is out of range for {num_currencies} currencies"
+            )
+
     # Initial currency is GBP (Problem constraint)
-    from_currency = int(os.getenv("FROM_CURRENCY", "0"))  # GBP
-    first_month = int(os.getenv("START_MONTH", "0"))  # First month
     portfolio_value = 1.0
 
-
-    # Start the recursive calculation from the first month with GBP
-    return max_return(
-        first_month,
-        from_currency,
-        portfolio_value,
+    # Reduce the returns backwards in time, starting from the first month with GBP
+    best_multiplier = _dp_kernel(
         monthly_returns_arr,
         num_months,
         num_currencies,
+        _START_MONTH,
+        _FROM_CURRENCY,
+        _TO_TRADE_CURRENCY,
     )
+    return portfolio_value * best_multiplier
 
 
 def main(input_args):
@@ -185,15 +467,15 @@ def main(input_args):
     if input_args:
         input_filename = input_args[0]
     else:
-        print(
+        console_logger.error(
             "\nError: Could not calculate the maximum returns. Please provide returns data file name."
         )
-        print("Usage of application: python main.py filename")
+        console_logger.error("Usage of application: python main.py filename")
         sys.exit(1)
     # Load the data from the file
     try:
-        logging.info(f"Loading data from file: {input_filename}")
-        
+        logging.info("Loading data from file: %s", input_filename)
+
         monthly_returns_matrix = load_data(input_filename)
 
         logging.info("Data loaded successfully")
@@ -204,13 +486,13 @@ def main(input_args):
 
         # Calculate the maximum profit
         max_profit_possible = (max_return_possible - 1.00)*100
-        max_profit_possible = round(max_profit_possible, 2)
 
-        print(f"Maximum possible return over the year: {max_profit_possible}%")
-        logging.info(f"Maximum possible return over the year: {max_profit_possible}%")
+        console_logger.info(
+            "Maximum possible return over the year: %.2f%%", max_profit_possible
+        )
     except Exception as exeption:
-        logging.exception(f"Error:{ exeption}")
-        print(
+        logging.exception("Error:%s", exeption)
+        console_logger.error(
             "\nCould not calculate the maximum returns. Please try again after correcting the errors."
         )
         sys.exit(1)
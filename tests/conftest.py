@@ -6,16 +6,35 @@ import numpy as np
 import pytest
 
 
-@pytest.fixture
+@pytest.fixture(scope="session", autouse=True)
+def disable_binary_cache():
+    # Tests must not write `<file>.npy` copies into ./data/; the binary cache
+    # tests enable it again for their tmp_path data
+    with patch("src.main._DISABLE_BINARY_CACHE", True):
+        yield
+
+
+@pytest.fixture(scope="session")
+def real_monthly_returns_arr():
+    # Loaded once for the whole test session; read-only, copy before mutating
+    # (not imported at module level: pytest loads this file before it captures
+    # logs, so src.main would then set up logging to the tracked app.log)
+    from src.main import load_data
+
+    yield load_data("currency_data.txt")
+
+
+@pytest.fixture(scope="session")
 def mock_monthly_returns_arr():
-    #data= [[]] # needs to be a 3d array of shape 12,4,4
-    monthly_returns_arr = np.array(data)
+    # Fixed-seed returns of shape (12,4,4); read-only, copy before mutating
+    monthly_returns_arr = np.random.default_rng(0).random((12, 4, 4)) + 1.0
+    monthly_returns_arr.flags.writeable = False
     yield monthly_returns_arr
 
 
 @pytest.fixture
-def mock_max_return():
-    with patch("src.main.max_return") as mock:
+def mock_dp_kernel():
+    with patch("src.main._dp_kernel") as mock:
         yield mock
 
 
@@ -1,7 +1,12 @@
 """
 Contains functional tests for the main function
 """
-from src.main import main
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from src.main import main, calculate_max_return
 
 
 def test_main(capsys):
@@ -13,4 +18,34 @@ def test_main(capsys):
     main(['currency_data.txt'])
     captured = capsys.readouterr()
     assert captured.out == "Maximum possible return over the year: 270.57%\n"
-    
\ No newline at end of file
+
+
+def test_main_script_after_package_import(tmp_path, mock_monthly_returns_arr):
+    """
+    Test that running the application as a script works after the kernels were
+    compiled (and cached on disk) through the `src` package, as in this test run
+    """
+    # Compile the kernels through the package import first
+    expected_return = calculate_max_return(mock_monthly_returns_arr)
+    (tmp_path / "currency_data.txt").write_text(
+        json.dumps(mock_monthly_returns_arr.tolist())
+    )
+
+    root_folder = Path(__file__).resolve().parents[2]
+    env = dict(
+        os.environ,
+        DATA_FOLDER=f"{tmp_path}/",
+        LOGGER_FILE=str(tmp_path / "app.log"),
+    )
+    result = subprocess.run(
+        [sys.executable, os.path.join("src", "main.py"), "currency_data.txt"],
+        cwd=root_folder,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == (
+        f"Maximum possible return over the year: {(expected_return - 1) * 100:.2f}%\n"
+    )
@@ -0,0 +1,93 @@
+"""
+This module contains unit tests for the _kernels.py module.
+"""
+
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from src._kernels import _dp_kernel, _dp_kernel_loops, _dp_kernel_numpy
+from src._kernels import _dp_kernel_unrolled, _dp_kernel_parallel
+
+
+def test_dp_kernels_agree(mock_monthly_returns_arr):
+    """
+    This function tests that the NumPy, loop, unrolled, parallel and (if available)
+    compiled implementations of the dynamic program return the same multiplier.
+    """
+    monthly_returns_arr = mock_monthly_returns_arr
+    monthly_returns_flat = monthly_returns_arr.reshape(12, 16)
+    for args in [(12, 4, 0, 0, 0), (12, 4, 3, 2, 1), (12, 4, 11, 1, 0)]:
+        expected_output = _dp_kernel_numpy(monthly_returns_flat, *args)
+        assert _dp_kernel_loops(monthly_returns_flat, *args) == pytest.approx(
+            expected_output
+        )
+        assert _dp_kernel_unrolled(
+            monthly_returns_flat, args[0], *args[2:]
+        ) == pytest.approx(expected_output)
+        if _dp_kernel_parallel is not None:
+            assert _dp_kernel_parallel(monthly_returns_flat, *args) == pytest.approx(
+                expected_output
+            )
+        assert _dp_kernel(monthly_returns_arr, *args) == pytest.approx(expected_output)
+
+
+def test_dp_kernel_parallel_threshold(monkeypatch):
+    """
+    This function tests that _dp_kernel() uses the parallel kernel, when there is
+    one, from _PARALLEL_MIN_TRADES trades and the general kernel below that.
+    """
+    mock_general = MagicMock(return_value=1.0)
+    mock_parallel = MagicMock(return_value=2.0)
+    monkeypatch.setattr("src._kernels._dp_kernel_general", mock_general)
+    monkeypatch.setattr("src._kernels._dp_kernel_parallel", mock_parallel)
+    monkeypatch.setattr("src._kernels._dp_kernel_4x4", None)
+    monkeypatch.setattr("src._kernels._PARALLEL_MIN_TRADES", 12 * 25)
+    small_returns_arr = np.ones((12, 4, 4))
+    large_returns_arr = np.ones((12, 5, 5))
+
+    assert _dp_kernel(small_returns_arr, 12, 4, 0, 0, 0) == 1.0
+    mock_parallel.assert_not_called()
+    assert _dp_kernel(large_returns_arr, 12, 5, 0, 0, 0) == 2.0
+    assert mock_parallel.call_args.args[0].shape == (12, 25)
+
+    # Without a parallel kernel (Numba missing or a single thread) the general one
+    # handles every size
+    monkeypatch.setattr("src._kernels._dp_kernel_parallel", None)
+    assert _dp_kernel(large_returns_arr, 12, 5, 0, 0, 0) == 1.0
+
+
+def test_returns_kernels(mock_monthly_returns_arr):
+    """
+    This function tests the ahead-of-time compiled kernels of `src.returns_kernels`
+    against the NumPy kernel; skipped unless built with `python build_kernels.py`.
+    """
+    returns_kernels = pytest.importorskip("src.returns_kernels")
+    monthly_returns_flat = mock_monthly_returns_arr.reshape(12, 16)
+    for args in [(12, 4, 0, 0, 0), (12, 4, 3, 2, 1), (12, 4, 11, 1, 0)]:
+        expected_output = _dp_kernel_numpy(monthly_returns_flat, *args)
+        assert returns_kernels.dp_max_return_f64(
+            monthly_returns_flat, *args
+        ) == pytest.approx(expected_output)
+        assert returns_kernels.dp_max_return_4x4_f64(
+            monthly_returns_flat, args[0], *args[2:]
+        ) == pytest.approx(expected_output)
+
+
+@pytest.mark.parametrize("num_currencies", [4, 7])
+def test_cython_dp_max_return(num_currencies):
+    """
+    This function tests the Cython kernel of `src._dp` against the NumPy kernel,
+    on the stack buffers (4 currencies) and the heap buffers (more than 4), with
+    read-only input; skipped unless built with `python build_kernels.py`.
+    """
+    dp = pytest.importorskip("src._dp")
+    rng = np.random.default_rng(num_currencies)
+    monthly_returns_flat = rng.random((12, num_currencies * num_currencies)) + 0.5
+    monthly_returns_flat.flags.writeable = False
+    for args in [(0, 0, 0), (3, 2, 1), (11, 1, num_currencies - 1)]:
+        expected_output = _dp_kernel_numpy(
+            monthly_returns_flat, 12, num_currencies, *args
+        )
+        assert dp.dp_max_return(
+            monthly_returns_flat, 12, num_currencies, *args
+        ) == pytest.approx(expected_output)
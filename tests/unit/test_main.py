@@ -3,11 +3,13 @@ This module contains unit tests for the main.py module.
 """
 import json
 import logging
+import os
+import numpy as np
 import pytest
 from src.main import load_data, max_return, calculate_max_return, main
 
 
-def test_load_data():
+def test_load_data(real_monthly_returns_arr):
     """
     This function tests the behavior of the load_data() function with valid input
     and asserts the output to the expected output. It also tests the behavior of the
@@ -15,8 +17,7 @@ def test_load_data():
     """
 
     # Test Scenario 1: Loading data from a valid monthly returns input file
-    monthly_returns_data = load_data("currency_data.txt")
-    assert monthly_returns_data.shape == (12, 4, 4)
+    assert real_monthly_returns_arr.shape == (12, 4, 4)
 
     # Test Scenario 2: Test loading data from an invalid file:
     # File not present in the given location
@@ -29,29 +30,211 @@ def test_load_data():
         load_data("currency_data_fail.txt")
 
 
-def test_max_return(mock_monthly_returns_arr):
+def test_load_data_npy(tmp_path, monkeypatch, mock_monthly_returns_arr):
+    """
+    This function tests that load_data() memory-maps binary `.npy` input files
+    and validates their shape like the JSON-like text files.
+    """
+    np.save(tmp_path / "currency_data.npy", mock_monthly_returns_arr)
+    np.save(tmp_path / "currency_data_fail.npy", mock_monthly_returns_arr[:6])
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+
+    monthly_returns_data = load_data("currency_data.npy")
+    assert isinstance(monthly_returns_data, np.memmap)
+    np.testing.assert_array_equal(monthly_returns_data, mock_monthly_returns_arr)
+
+    with pytest.raises(Exception):
+        load_data("currency_data_fail.npy")
+
+
+def test_load_data_raw(tmp_path, monkeypatch, mock_monthly_returns_arr):
+    """
+    This function tests that load_data() reads raw float64 `.bin` files and
+    whitespace-separated `.dat` files, and rejects files that do not hold 12 months
+    or that contain NaN or infinite returns.
+    """
+    (tmp_path / "currency_data.bin").write_bytes(
+        mock_monthly_returns_arr.astype("<f8").tobytes()
+    )
+    (tmp_path / "currency_data_fail.bin").write_bytes(
+        mock_monthly_returns_arr[:, :, :3].astype("<f8").tobytes()
+    )
+    np.savetxt(tmp_path / "currency_data.dat", mock_monthly_returns_arr.reshape(12, 16))
+    non_finite_arr = mock_monthly_returns_arr.reshape(12, 16).copy()
+    non_finite_arr[5, 3] = np.nan
+    np.savetxt(tmp_path / "currency_data_nan.dat", non_finite_arr)
+    non_finite_arr[5, 3] = np.inf
+    (tmp_path / "currency_data_inf.bin").write_bytes(
+        non_finite_arr.astype("<f8").tobytes()
+    )
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+
+    monthly_returns_data = load_data("currency_data.bin")
+    np.testing.assert_array_equal(monthly_returns_data, mock_monthly_returns_arr)
+    assert not monthly_returns_data.flags.writeable
+
+    monthly_returns_data = load_data("currency_data.dat")
+    np.testing.assert_allclose(monthly_returns_data, mock_monthly_returns_arr)
+
+    with pytest.raises(Exception):
+        load_data("currency_data_fail.bin")
+    with pytest.raises(ValueError):
+        load_data("currency_data_nan.dat")
+    with pytest.raises(ValueError):
+        load_data("currency_data_inf.bin")
+
+
+def test_load_data_cache(tmp_path, monkeypatch):
+    """
+    This function tests that load_data() returns read-only views of a cached
+    array until the file is modified, and re-reads the file afterwards.
+    """
+    file_path = tmp_path / "currency_data.txt"
+    file_path.write_text(json.dumps(np.ones((12, 4, 4)).tolist()))
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+
+    first_load = load_data("currency_data.txt")
+    second_load = load_data("currency_data.txt")
+    assert first_load is not second_load
+    assert np.shares_memory(first_load, second_load)
+    assert not first_load.flags.writeable
+
+    file_path.write_text(json.dumps((2 * np.ones((12, 4, 4))).tolist()))
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert np.all(load_data("currency_data.txt") == 2.0)
+
+
+def test_load_data_binary_cache(tmp_path, monkeypatch):
+    """
+    This function tests that load_data() saves parsed text files as `.npy` files
+    and memory-maps them on later loads until the text file is modified.
+    """
+    file_path = tmp_path / "currency_data.txt"
+    file_path.write_text(json.dumps(np.ones((12, 4, 4)).tolist()))
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+    monkeypatch.setattr("src.main._DISABLE_LOAD_CACHE", True)
+    monkeypatch.setattr("src.main._DISABLE_BINARY_CACHE", False)
+
+    first_load = load_data("currency_data.txt")
+    assert not isinstance(first_load, np.memmap)
+    assert (tmp_path / "currency_data.txt.npy").exists()
+
+    second_load = load_data("currency_data.txt")
+    assert isinstance(second_load, np.memmap)
+    np.testing.assert_array_equal(second_load, first_load)
+
+    file_path.write_text(json.dumps((2 * np.ones((12, 4, 4))).tolist()))
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert np.all(load_data("currency_data.txt") == 2.0)
+
+    # Data rejected by the shape check is not cached
+    (tmp_path / "currency_data_fail.txt").write_text(
+        json.dumps(np.ones((6, 4, 4)).tolist())
+    )
+    with pytest.raises(Exception):
+        load_data("currency_data_fail.txt")
+    assert not (tmp_path / "currency_data_fail.txt.npy").exists()
+
+
+@pytest.mark.parametrize("bad_value", ["null", '"1.5"', "NaN"])
+def test_load_data_invalid_values(tmp_path, monkeypatch, bad_value):
+    """
+    This function tests that load_data() rejects JSON-like text files holding
+    anything but finite numbers, and does not cache them as `.npy` files.
+    """
+    content = json.dumps(np.ones((12, 4, 4)).tolist())
+    (tmp_path / "currency_data.txt").write_text(content.replace("1.0", bad_value, 1))
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+    monkeypatch.setattr("src.main._DISABLE_BINARY_CACHE", False)
+
+    with pytest.raises(Exception):
+        load_data("currency_data.txt")
+    assert not (tmp_path / "currency_data.txt.npy").exists()
+
+
+@pytest.mark.parametrize("bad_value", [np.nan, np.inf])
+def test_load_data_non_finite(tmp_path, monkeypatch, bad_value):
+    """
+    This function tests that load_data() rejects data containing NaN or infinite
+    returns, which would otherwise be reported as the maximum return.
+    """
+    monthly_returns_arr = np.ones((12, 4, 4))
+    monthly_returns_arr[5, 0, :] = bad_value
+    np.save(tmp_path / "currency_data.npy", monthly_returns_arr)
+    monkeypatch.setattr("src.main._DATA_FOLDER", f"{tmp_path}/")
+
+    with pytest.raises(ValueError):
+        load_data("currency_data.npy")
+
+
+def test_max_return(real_monthly_returns_arr):
     """
     This function tests the behavior of the max_return() function with valid input 
     and assrts the output to the expected output..
     """
     expected_output = 3.705696694904843
-    assert max_return(0, 0, 1.0, mock_monthly_returns_arr, 12, 4) == expected_output
+    assert max_return(0, 0, 1.0, real_monthly_returns_arr, 12, 4) == expected_output
+
+
+def test_max_return_matches_dp():
+    """
+    This function tests that the stack-based search in max_return() finds the
+    same maximum return as the dynamic program used by calculate_max_return().
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        monthly_returns_arr = rng.random((12, 4, 4)) + 0.5
+        expected_output = calculate_max_return(monthly_returns_arr)
+        assert max_return(0, 0, 1.0, monthly_returns_arr, 12, 4) == pytest.approx(
+            expected_output
+        )
 
+    # Near-identical returns keep the upper bound tight, so pruning cuts deep
+    monthly_returns_arr = 1.0 + rng.random((12, 4, 4)) * 1e-3
+    expected_output = calculate_max_return(monthly_returns_arr)
+    assert max_return(0, 0, 1.0, monthly_returns_arr, 12, 4) == pytest.approx(
+        expected_output
+    )
 
-def test_calculate_max_return(mock_max_return, mock_monthly_returns_arr):
+
+def test_calculate_max_return(mock_dp_kernel, mock_monthly_returns_arr):
     """
     This function tests the behavior of the calculate_max_return() function 
     and asserts the output to the expected output.
-    The mock_max_return() function is mocked to return the expected output.
-    The max_return function is check for the expected call with the expected arguments.
+    The mock_dp_kernel() function is mocked to return the expected output.
+    The _dp_kernel function is check for the expected call with the expected arguments.
     """
     expected_output = 3.705696694904843
-    mock_max_return.return_value = expected_output
+    mock_dp_kernel.return_value = expected_output
     actual_result = calculate_max_return(mock_monthly_returns_arr)
-    mock_max_return.assert_called_once_with(0, 0, 1.0, mock_monthly_returns_arr, 12, 4)
+    mock_dp_kernel.assert_called_once_with(mock_monthly_returns_arr, 12, 4, 0, 0, 0)
     assert actual_result == expected_output
 
 
+@pytest.mark.parametrize(
+    "constraint, value",
+    [
+        ("_START_MONTH", 12),
+        ("_START_MONTH", -1),
+        ("_FROM_CURRENCY", 4),
+        ("_FROM_CURRENCY", -1),
+        ("_TO_TRADE_CURRENCY", 4),
+    ],
+)
+def test_calculate_max_return_invalid_constraint(
+    monkeypatch, mock_monthly_returns_arr, constraint, value
+):
+    """
+    This function tests that calculate_max_return() rejects a configured start month
+    or currencies that are not in the returns data, instead of returning a value.
+    """
+    monkeypatch.setattr(f"src.main.{constraint}", value)
+    with pytest.raises(IndexError):
+        calculate_max_return(mock_monthly_returns_arr)
+
+
 def test_main(mock_load_data, mock_calculate_max_return, caplog):
     """
     This function tests the behavior of the main() function in terms of logging.